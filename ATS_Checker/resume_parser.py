@@ -1,8 +1,8 @@
 import streamlit as st
 import re
-import io
 import logging
 import pandas as pd
+import pypdfium2 as pdfium
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
@@ -20,85 +20,80 @@ COMMON_SKILLS = {
 
 ALL_SKILLS = [skill for category in COMMON_SKILLS.values() for skill in category]
 
-@st.cache_resource
-def load_nlp_model():
+# Longest first so multi-word skills win over their prefixes at the same position
+SKILL_RE = re.compile(r'\b(' + '|'.join(re.escape(s.lower()) for s in sorted(ALL_SKILLS, key=len, reverse=True)) + r')\b')
+TECH_RE = re.compile(r'\b[A-Za-z][\w\+\#\.\-]{2,}\b')
+NONWORD_RE = re.compile(r'[^\w\s\.\-]')
+WHITESPACE_RE = re.compile(r'\s+')
+
+@st.cache_resource(max_entries=32)
+def load_skill_automaton(skills):
     try:
-        import spacy
-        try:
-            return spacy.load('en_core_web_sm')
-        except OSError:
-            st.warning("Downloading spaCy model. This may take a moment...")
-            import subprocess
-            subprocess.call([
-                "python", "-m", "spacy", "download", "en_core_web_sm"
-            ])
-            return spacy.load('en_core_web_sm')
+        import ahocorasick
     except ImportError:
-        st.error("spaCy is not installed. Installing required packages...")
-        import subprocess
-        subprocess.call(["pip", "install", "spacy"])
-        subprocess.call(["python", "-m", "spacy", "download", "en_core_web_sm"])
-        import spacy
-        return spacy.load('en_core_web_sm')
+        logger.info("pyahocorasick not installed, falling back to regex skill matching")
+        return None
+    automaton = ahocorasick.Automaton()
+    for skill in skills:
+        automaton.add_word(skill, skill)
+    automaton.make_automaton()
+    return automaton
+
+def _is_word_boundary(text, i):
+    before = i > 0 and (text[i - 1].isalnum() or text[i - 1] == '_')
+    after = i < len(text) and (text[i].isalnum() or text[i] == '_')
+    return before != after
 
-@st.cache_resource
-def load_pdf_module():
+def find_skills_with_automaton(automaton, text):
+    found = set()
+    for end, skill in automaton.iter(text):
+        start = end - len(skill) + 1
+        if _is_word_boundary(text, start) and _is_word_boundary(text, end + 1):
+            found.add(skill)
+    return found
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def extract_text_from_pdf_cached(pdf_bytes):
+    pdf = pdfium.PdfDocument(pdf_bytes)
     try:
-        import PyPDF2
-        return PyPDF2
-    except ImportError:
-        st.warning("Installing PDF processing library...")
-        import subprocess
-        subprocess.call(["pip", "install", "PyPDF2"])
-        import PyPDF2
-        return PyPDF2
+        return " ".join(page.get_textpage().get_text_range() for page in pdf).strip()
+    finally:
+        pdf.close()
 
 def extract_text_from_pdf(pdf_file):
-    PyPDF2 = load_pdf_module()
-    
-    text = ""
     try:
-        pdf_bytes = io.BytesIO(pdf_file.read())
+        pdf_bytes = pdf_file.read()
         pdf_file.seek(0)
-        reader = PyPDF2.PdfReader(pdf_bytes)
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text += page_text + " "
-        return text.strip()
+        return extract_text_from_pdf_cached(pdf_bytes)
     except Exception as e:
         logger.error(f"Error reading PDF: {str(e)}")
         st.error(f"Error extracting text from PDF: {str(e)}")
         return ""
 
+@st.cache_data(max_entries=32, show_spinner=False)
 def preprocess_text(text):
     if not text:
         return ""
-    text = re.sub(r'[\n\t\r]', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    text = re.sub(r'[^\w\s\.\-]', ' ', text)
-    text = text.strip()
-    return text
+    text = NONWORD_RE.sub(' ', text)
+    return WHITESPACE_RE.sub(' ', text).strip()
 
 class ResumeParser:
-    def __init__(self, text):
+    def __init__(self, text, preprocessed=False):
         self.raw_text = text
-        self.text = preprocess_text(text)
+        self.text = text if preprocessed else preprocess_text(text)
 
     def extract_skills(self):
         if not self.text:
             return []
         
-        extracted_skills = set()
         text_lower = self.text.lower()
+        automaton = load_skill_automaton(tuple(skill.lower() for skill in ALL_SKILLS))
+        if automaton is not None:
+            extracted_skills = find_skills_with_automaton(automaton, text_lower)
+        else:
+            extracted_skills = set(SKILL_RE.findall(text_lower))
         
-        for skill in ALL_SKILLS:
-            pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-            if re.search(pattern, text_lower):
-                extracted_skills.add(skill)
-        
-        tech_pattern = r'\b[A-Za-z][\w\+\#\.\-]{2,}\b'
-        tech_matches = re.findall(tech_pattern, self.text)
+        tech_matches = TECH_RE.findall(self.text)
         
         for match in tech_matches:
             if (len(match) > 2 and 
@@ -110,30 +105,42 @@ class ResumeParser:
         skills_list.sort()
         return skills_list
 
-def score_resume_by_skills(resume_text, job_skills):
+@st.cache_data(max_entries=32, show_spinner=False)
+def extract_skills_cached(processed_text):
+    return ResumeParser(processed_text, preprocessed=True).extract_skills()
+
+def score_resume_by_skills(processed_resume, job_skills):
     if not job_skills:
         return 0.0, set()
     
     job_skills_lower = [skill.lower() for skill in job_skills]
     
-    resume_lower = preprocess_text(resume_text).lower()
-    matched_skills = set()
+    resume_lower = processed_resume.lower()
+    unique_skills = sorted(set(job_skills_lower), key=len, reverse=True)
     
-    for skill in job_skills_lower:
-        pattern = r'\b' + re.escape(skill) + r'\b'
-        if re.search(pattern, resume_lower):
-            matched_skills.add(skill)
+    automaton = load_skill_automaton(tuple(unique_skills))
+    if automaton is not None:
+        matched_skills = find_skills_with_automaton(automaton, resume_lower)
+    else:
+        # Zero-width lookahead finds the longest skill at every start position, so partly
+        # overlapping skills ("machine learning" / "learning models") are all seen
+        pattern = re.compile(r'(?=\b(' + '|'.join(re.escape(skill) for skill in unique_skills) + r')\b)')
+        matched_skills = {match.group(1) for match in pattern.finditer(resume_lower)}
+        
+        # Shorter skills starting at the same position as a longer match (e.g. "data" in "data analysis")
+        for match in list(matched_skills):
+            for skill in unique_skills:
+                if skill != match and skill in match and re.search(r'\b' + re.escape(skill) + r'\b', match):
+                    matched_skills.add(skill)
     
     score = (len(matched_skills) / len(set(job_skills_lower))) * 100
     return round(score, 2), matched_skills
 
-def score_resume_by_text_similarity(resume_text, job_description_text):
-    if not resume_text or not job_description_text:
+@st.cache_data(max_entries=32, show_spinner=False)
+def score_resume_by_text_similarity(processed_resume, processed_job):
+    if not processed_resume or not processed_job:
         return 0.0
     
-    processed_resume = preprocess_text(resume_text)
-    processed_job = preprocess_text(job_description_text)
-    
     try:
         vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2))
         vectors = vectorizer.fit_transform([processed_resume, processed_job])
@@ -150,18 +157,19 @@ def calculate_final_resume_score(resume_text, job_description_text, skill_weight
             "Text Similarity Score": 0.0,
             "Final Resume Score": 0.0,
             "Matched Skills": set(),
+            "Missing Skills": set(),
             "Job Skills": [],
             "Resume Skills": []
         }
     
-    job_parser = ResumeParser(job_description_text)
-    job_skills = job_parser.extract_skills()
+    processed_resume = preprocess_text(resume_text)
+    processed_job = preprocess_text(job_description_text)
     
-    resume_parser = ResumeParser(resume_text)
-    resume_skills = resume_parser.extract_skills()
+    job_skills = [skill.lower() for skill in extract_skills_cached(processed_job)]
+    resume_skills = extract_skills_cached(processed_resume)
     
-    skill_score, matched_skills = score_resume_by_skills(resume_text, job_skills)
-    text_similarity_score = score_resume_by_text_similarity(resume_text, job_description_text)
+    skill_score, matched_skills = score_resume_by_skills(processed_resume, job_skills)
+    text_similarity_score = score_resume_by_text_similarity(processed_resume, processed_job)
     
     final_score = round((skill_score * skill_weight) + (text_similarity_score * text_weight), 2)
     
@@ -170,6 +178,7 @@ def calculate_final_resume_score(resume_text, job_description_text, skill_weight
         "Text Similarity Score": text_similarity_score,
         "Final Resume Score": final_score,
         "Matched Skills": matched_skills,
+        "Missing Skills": set(job_skills) - matched_skills,
         "Job Skills": job_skills,
         "Resume Skills": resume_skills
     }
@@ -247,7 +256,7 @@ def main():
                 else:
                     st.write("No skills matched. Try updating your resume with relevant keywords from the job description.")
                     
-                missing_skills = set([s.lower() for s in result["Job Skills"]]) - set([s.lower() for s in result["Matched Skills"]])
+                missing_skills = result["Missing Skills"]
                 st.write("#### ❌ Missing Skills")
                 if missing_skills:
                     for skill in sorted(missing_skills):
@@ -1,48 +1,154 @@
 import streamlit as st
+import re
+import torch
 from transformers import pipeline
 import pdfkit
 import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
 from jinja2 import Environment, FileSystemLoader
 
 # --- Setup ---
 st.set_page_config(page_title="Resume Builder Using Transformers", layout="centered")
 
-@st.cache_resource
-def load_flan_model():
-    return pipeline("text2text-generation", model="google/flan-t5-large")
-
-generator = load_flan_model()
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MODEL_OPTIONS = {
+    "Fast (base)": "google/flan-t5-base",
+    "Quality (large)": "google/flan-t5-large",
+}
+
+# One model resident at a time; switching models evicts the other
+@st.cache_resource(max_entries=1)
+def load_flan_model(model_name="google/flan-t5-base"):
+    pipe = pipeline(
+        "text2text-generation",
+        model=model_name,
+        torch_dtype=torch.bfloat16 if torch.cuda.is_available() else torch.float32,
+        device_map="auto"
+    )
+    try:
+        from optimum.bettertransformer import BetterTransformer
+        pipe.model = BetterTransformer.transform(pipe.model, keep_original_model=False)
+    except Exception as e:
+        logger.warning(f"BetterTransformer unavailable, using the stock model: {str(e)}")
+    if torch.cuda.is_available():
+        eager_forward = pipe.model.forward
+        try:
+            # Compile forward rather than the module so generate() still goes through it.
+            # The KV cache grows every decode step, so compile for dynamic shapes
+            # instead of recording a CUDA graph per shape.
+            pipe.model.forward = torch.compile(eager_forward, mode="default", dynamic=True)
+            # Compilation is lazy, so run one step now to surface backend failures here
+            pipe("warmup", max_new_tokens=1)
+        except Exception as e:
+            pipe.model.forward = eager_forward
+            logger.warning(f"torch.compile failed, running eagerly: {str(e)}")
+    return pipe
+
+# Beam search keeps helper outputs deterministic (and therefore cacheable)
+DECODING_KWARGS = dict(do_sample=False, num_beams=4, early_stopping=True, length_penalty=1.0)
+
+model_choice = st.sidebar.selectbox("Model", list(MODEL_OPTIONS.keys()))
+bullet_prompt_choice = st.sidebar.selectbox("Bullet Prompt", ["Few-shot", "Few-shot (grouped, experimental)", "Short"])
+generator = load_flan_model(MODEL_OPTIONS[model_choice])
 
 # Configure pdfkit path (Windows users should update this if different)
 path_wkhtmltopdf = r"C:\\Program Files\\wkhtmltopdf\\bin\\wkhtmltopdf.exe"
 config = pdfkit.configuration(wkhtmltopdf=path_wkhtmltopdf)
 
 # --- AI Utilities ---
-def polish_experience(raw_text):
-    prompt = f"""
-    Improve the following resume bullet point by making it more professional, action-oriented, and quantifiable. Use strong verbs, specify tools/technologies, and add measurable outcomes when possible.
-
-    Examples:
-    Original: built a website  
-    Polished: Developed and deployed a responsive company website using React and Node.js, improving user engagement by 40%.
-
-    Original: did internship at google in data  
-    Polished: Completed a data analytics internship at Google, creating automated dashboards in Python that streamlined reporting for 5+ teams.
-
-    Original: led a team of 4 in a web dev project  
-    Polished: Led a team of 4 developers to build a full-stack web application using React and Flask, reducing delivery time by 25%.
-
-    Original: worked on a chatbot project for a few months  
-    Polished: Designed and implemented a customer service chatbot using Python and Dialogflow, decreasing average support resolution time by 30%.
-
-    Original: {raw_text}  
-    Polished:"""
+POLISH_PREAMBLE = """Improve the following resume bullet point by making it more professional, action-oriented, and quantifiable. Use strong verbs, specify tools/technologies, and add measurable outcomes when possible.
+
+Examples:
+Original: built a website
+Polished: Developed and deployed a responsive company website using React and Node.js, improving user engagement by 40%.
+
+Original: did internship at google in data
+Polished: Completed a data analytics internship at Google, creating automated dashboards in Python that streamlined reporting for 5+ teams.
+
+Original: led a team of 4 in a web dev project
+Polished: Led a team of 4 developers to build a full-stack web application using React and Flask, reducing delivery time by 25%.
+
+Original: worked on a chatbot project for a few months
+Polished: Designed and implemented a customer service chatbot using Python and Dialogflow, decreasing average support resolution time by 30%.
+"""
+
+# Instruction-only alternative to the few-shot preamble; far fewer tokens to encode
+POLISH_PROMPT_SHORT = "Rewrite this resume bullet as a strong, quantified, action-oriented statement using concrete tools and metrics.\n\nBullet: {raw}\nRewritten:"
+
+# Numbered variant for grouped prompts. The T5 tokenizer drops newlines, so the
+# "Polished N:" labels, not the layout, are what separate the outputs.
+POLISH_GROUP_PREAMBLE = (
+    "Improve each of the following resume bullet points by making it more professional, action-oriented, and quantifiable. "
+    "Use strong verbs, specify tools/technologies, and add measurable outcomes when possible. "
+    "Start each rewritten bullet with \"Polished N:\", where N matches its \"Original N:\". "
+    "Example: Original 1: built a website Original 2: did internship at google in data "
+    "Polished 1: Developed and deployed a responsive company website using React and Node.js, improving user engagement by 40%. "
+    "Polished 2: Completed a data analytics internship at Google, creating automated dashboards in Python that streamlined reporting for 5+ teams."
+)
+
+POLISHED_ITEM_RE = re.compile(r'Polished (\d+):\s*(.*?)(?=Polished \d+:|$)', re.S)
+
+def build_polish_prompt(raw_text, short=False):
+    if short:
+        return POLISH_PROMPT_SHORT.format(raw=raw_text)
+    return POLISH_PREAMBLE + f"\nOriginal: {raw_text}\nPolished:"
+
+def build_polish_group_prompt(raw_texts):
+    originals = " ".join(f"Original {i}: {raw_text}" for i, raw_text in enumerate(raw_texts, 1))
+    return f"{POLISH_GROUP_PREAMBLE} Now: {originals}"
+
+def polish_experiences(raw_texts, short=False):
+    if not raw_texts:
+        return []
+    prompts = [build_polish_prompt(raw_text, short) for raw_text in raw_texts]
+
+    # Sort by token length so each batch pads to a similar size, then restore order
+    lengths = [len(generator.tokenizer.encode(p)) for p in prompts]
+    order = sorted(range(len(prompts)), key=lambda i: lengths[i])
+    results = generator([prompts[i] for i in order], max_new_tokens=48, batch_size=min(len(prompts), 16), **DECODING_KWARGS)
+
+    polished = [""] * len(prompts)
+    for i, result in enumerate(results):
+        # The pipeline flattens single-sequence batch outputs to plain dicts
+        if isinstance(result, list):
+            result = result[0]
+        text = result['generated_text']
+        polished[order[i]] = text.strip().split("\n")[0].strip("\u2022- ").strip()
+    return polished
 
-    result = generator(prompt, max_length=120, temperature=0.9, top_p=0.95, do_sample=True)[0]['generated_text']
-    polished = result.strip().split("\n")[0].strip("\u2022- ").strip()
+def polish_experiences_batched(bullets, k=4):
+    if not bullets:
+        return []
+    groups = [bullets[i:i + k] for i in range(0, len(bullets), k)]
+    prompts = [build_polish_group_prompt(group) for group in groups]
+    results = generator(prompts, max_new_tokens=48 * k, batch_size=min(len(prompts), 16), **DECODING_KWARGS)
+
+    polished = [""] * len(bullets)
+    for g, result in enumerate(results):
+        if isinstance(result, list):
+            result = result[0]
+        items = {}
+        for index, item in POLISHED_ITEM_RE.findall(result['generated_text']):
+            item = item.strip().split("\n")[0].strip("\u2022- ").strip()
+            if item:
+                items.setdefault(int(index), item)
+        for i in range(len(groups[g])):
+            polished[g * k + i] = items.get(i + 1, "")
+
+    # Only bullets the model didn't return under their own number go through the per-bullet prompt
+    missing = [i for i, text in enumerate(polished) if not text]
+    if missing:
+        for i, text in zip(missing, polish_experiences([bullets[i] for i in missing])):
+            polished[i] = text
     return polished
 
-def generate_summary(name, role, experience, skills, projects, bio):
+def polish_experience(raw_text):
+    return polish_experiences([raw_text])[0]
+
+def _generate_summary_impl(name, role, experience, skills, projects, bio):
     prompt = f"""
     Write a concise and confident resume summary based on the following:
     Name: {name}
@@ -52,10 +158,17 @@ def generate_summary(name, role, experience, skills, projects, bio):
     Projects: {projects}
     Bio: {bio}
     """
-    result = generator(prompt, max_length=256, do_sample=True, temperature=0.9)[0]['generated_text']
+    result = generator(prompt, max_new_tokens=200, **DECODING_KWARGS)[0]['generated_text']
     return result.strip()
 
-def generate_bio(name, role, experience, skills, projects):
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _generate_summary_cached(model_name, name, role, experience, skills, projects, bio):
+    return _generate_summary_impl(name, role, experience, skills, projects, bio)
+
+def generate_summary(name, role, experience, skills, projects, bio):
+    return _generate_summary_cached(MODEL_OPTIONS[model_choice], name, role, experience, skills, projects, bio)
+
+def _generate_bio_impl(name, role, experience, skills, projects):
     prompt = f"""
     Write a professional third-person bio for a resume.
 
@@ -74,24 +187,49 @@ def generate_bio(name, role, experience, skills, projects):
 
     Resume Bio:
     """
-    result = generator(prompt, max_length=300, temperature=0.7)[0]['generated_text']
+    result = generator(prompt, max_new_tokens=220, **DECODING_KWARGS)[0]['generated_text']
     return result.strip()
 
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _generate_bio_cached(model_name, name, role, experience, skills, projects):
+    return _generate_bio_impl(name, role, experience, skills, projects)
 
-def suggest_skills(bio, role):
+def generate_bio(name, role, experience, skills, projects):
+    return _generate_bio_cached(MODEL_OPTIONS[model_choice], name, role, experience, skills, projects)
+
+def _suggest_skills_impl(bio, role):
     prompt = f"""
     Based on the following bio of an {role}, suggest only technical and domain-relevant skills. Avoid vague terms like "coding" or "sys". Focus on AI/ML/NLP/Data/Software skills only.
 
     Bio: {bio}
     Suggested Skills:
     """
-    result = generator(prompt, max_length=100, temperature=0.9, top_p=0.95, do_sample=True)[0]['generated_text']
+    result = generator(prompt, max_new_tokens=64, **DECODING_KWARGS)[0]['generated_text']
     return result.strip().replace("\n", ", ")
 
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def _suggest_skills_cached(model_name, bio, role):
+    return _suggest_skills_impl(bio, role)
+
+def suggest_skills(bio, role):
+    return _suggest_skills_cached(MODEL_OPTIONS[model_choice], bio, role)
+
 # --- PDF Creation ---
+@st.cache_resource
+def _jinja_env():
+    return Environment(loader=FileSystemLoader("templates"), autoescape=True)
+
+@st.cache_resource
+def _pdf_pool():
+    return ThreadPoolExecutor(max_workers=2)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def render_pdf(html_content):
+    future = _pdf_pool().submit(pdfkit.from_string, html_content, False, configuration=config)
+    return future.result()
+
 def create_pdf(name, role, experience, summary, experience_list, skills, bio, template_name="minimal.html"):
-    env = Environment(loader=FileSystemLoader("templates"))
-    template = env.get_template(template_name)
+    template = _jinja_env().get_template(template_name)
 
     html_content = template.render(
         name=name,
@@ -103,8 +241,7 @@ def create_pdf(name, role, experience, summary, experience_list, skills, bio, te
         bio=bio
     )
 
-    pdf = pdfkit.from_string(html_content, False, configuration=config)
-    return pdf
+    return render_pdf(html_content)
 
 # --- UI ---
 st.title("Resume Builder Using Transformers")
@@ -123,8 +260,8 @@ with tab1:
     if st.button("🔄 Suggest Skills", key="suggest_skills_button"):
         if name and role and experience:
             with st.spinner("Generating skill suggestions..."):
-                temp_bio = generate_bio(name, role, experience, skills, "")
-                suggestions = suggest_skills(temp_bio, role)
+                basis = st.session_state.get("generated_bio") or f"{name}, {role}, {experience} yrs, skills: {skills}"
+                suggestions = suggest_skills(basis, role)
                 st.success("✅ Suggested Skills:")
                 st.markdown(f"**{suggestions}**")
         else:
@@ -143,8 +280,12 @@ with tab2:
             st.session_state.enhanced_experiences = []
             raw_bullets = [line.strip("-• ").strip() for line in raw_input.splitlines() if line.strip()]
             with st.spinner("Enhancing..."):
-                for bullet in raw_bullets:
-                    st.session_state.enhanced_experiences.append(polish_experience(bullet))
+                if bullet_prompt_choice == "Short":
+                    st.session_state.enhanced_experiences = polish_experiences(raw_bullets, short=True)
+                elif bullet_prompt_choice == "Few-shot (grouped, experimental)":
+                    st.session_state.enhanced_experiences = polish_experiences_batched(raw_bullets)
+                else:
+                    st.session_state.enhanced_experiences = polish_experiences(raw_bullets)
             st.success("✅ Enhanced Bullet Points:")
             for e in st.session_state.enhanced_experiences:
                 st.markdown(f"• {e}")
@@ -193,16 +334,17 @@ with tab4:
         st.markdown("---")
         template_choice = st.selectbox("Choose Resume Template", ["minimal.html", "professional.html", "creative.html"])
         if st.button("📄 Download Resume PDF"):
-            pdf_data = create_pdf(
-                name,
-                role,
-                experience,
-                st.session_state.generated_summary,
-                st.session_state.get("enhanced_experiences", []),
-                skills,
-                st.session_state.get("generated_bio", ""),
-                template_choice
-            )
+            with st.spinner("Rendering PDF..."):
+                pdf_data = create_pdf(
+                    name,
+                    role,
+                    experience,
+                    st.session_state.generated_summary,
+                    st.session_state.get("enhanced_experiences", []),
+                    skills,
+                    st.session_state.get("generated_bio", ""),
+                    template_choice
+                )
             st.download_button("📄 Download Resume PDF", data=pdf_data, file_name="resume.pdf", mime="application/pdf")
 
         st.download_button("🔍 Download Summary TXT", st.session_state.generated_summary, file_name="resume_summary.txt")
\ No newline at end of file